@@ -1,20 +1,39 @@
 import os
 import logging
 import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def foldCCTs(aggregateCcts):
+    # Emit the aggregated calling contexts in the folded format of flamegraph.pl.
+    return ''.join(k.replace('->', ';') + ' ' + str(v) + '\n'
+                   for k, v in aggregateCcts.items())
 
 
 def aggregateCCTs(cctsAndtime):
-    aggregateCcts = {}
+    # Sum the times of each calling context across traces.
+    aggregateCcts = Counter()
     for time, ccts in cctsAndtime:
-        for k, v in ccts.items():
-            if not k in aggregateCcts:
-                aggregateCcts[k] = v
-            else:
-                aggregateCcts[k] += v
-    flameGraph = ''
-    for k, v in aggregateCcts.items():
-        flameGraph += k.replace('->', ';') + ' ' + str(v) + '\n'
-    return flameGraph
+        aggregateCcts.update(ccts)
+    return foldCCTs(aggregateCcts)
+
+
+def runToFile(cmd, outPath, stdin=None):
+    # Run cmd with its stdout redirected to outPath, feeding it the stdin bytes if given.
+    with open(outPath, 'wb') as f:
+        subprocess.run(cmd, input=stdin, stdout=f, check=True)
+
+
+def runConcurrently(tasks):
+    # Run independent (cmd, outPath, stdin) tasks in parallel.
+    # The work happens in the child processes, so threads are enough to drive them.
+    if len(tasks) == 0:
+        return
+    with ThreadPoolExecutor(
+            max_workers=min(os.cpu_count() or 1, len(tasks))) as executor:
+        # Consume the results so that a failing command raises here.
+        list(executor.map(lambda task: runToFile(*task), tasks))
 
 
 def flameGraph(metrics, outputDir):
@@ -32,12 +51,23 @@ def flameGraph(metrics, outputDir):
     percentilesExclusive = sorted([50, 95, 99])
     flameGraphPctFilePair = []
     differentialFlameGraphFiles = []
+    # The perl scripts are launched once all inputs are known:
+    # flame graphs and diff CCTs first, then the diff flame graphs that read those diff CCTs.
+    flameGraphTasks = []
+    diffFlameGraphTasks = []
+    # Each percentile aggregates a prefix of the sorted traces, so keep a running
+    # aggregate and only add the traces beyond the previous percentile's limit.
+    aggregateCcts = Counter()
+    aggregated = 0
     for p in percentilesExclusive:
         limit = int(round(len(cctsAndtime) * p / 100))
         if limit == 0:
             logging.info(f"not enough samples for P" + str(p) + " flamegraph")
             continue
-        flameGraph = aggregateCCTs(cctsAndtime[:limit])
+        for time, ccts in cctsAndtime[aggregated:limit]:
+            aggregateCcts.update(ccts)
+        aggregated = limit
+        flameGraph = foldCCTs(aggregateCcts)
 
         cctFile = 'flame-graph-P' + str(p) + '.cct'
         flamegraphPath = os.path.join(outputDir, cctFile)
@@ -46,24 +76,26 @@ def flameGraph(metrics, outputDir):
 
         svgFile = flamegraphPath + '.svg'
         flameGraphPctFilePair.append(('P' + str(p), svgFile))
-        with open(svgFile, 'w') as f:
-            subprocess.check_call(('./flamegraph.pl', flamegraphPath),
-                                  stdout=f)
+        # flamegraph.pl reads stdin when given no file, so hand it the CCT we already hold
+        # instead of reading back the file, which is only kept for difffolded.pl.
+        flameGraphTasks.append(
+            (('./flamegraph.pl', ), svgFile, flameGraph.encode()))
 
         # if there are predecessors, do a differential analysis with them
         for predPct, predFile in flameGraphPctFilePair[:-1]:
             diffCCTFile = 'flame-graph-' + predPct + 'vsP' + str(p) + '.cct'
             diffFilePath = os.path.join(outputDir, diffCCTFile)
             # produce diff CCT
-            with open(diffFilePath, 'w') as f:
-                print(('./difffolded.pl', flamegraphPath, predFile))
-                subprocess.check_call(('./difffolded.pl', '-n', predFile.rstrip('.svg'), flamegraphPath),
-                                      stdout=f)
+            print(('./difffolded.pl', flamegraphPath, predFile))
+            flameGraphTasks.append((('./difffolded.pl', '-n',
+                                     predFile.rstrip('.svg'), flamegraphPath),
+                                    diffFilePath, None))
             # produce diff SVG
             diffSVGFile = diffFilePath + '.svg'
-            with open(diffSVGFile, 'w') as f:
-                subprocess.check_call(('./flamegraph.pl', diffFilePath),
-                                      stdout=f)
+            diffFlameGraphTasks.append(
+                (('./flamegraph.pl', diffFilePath), diffSVGFile, None))
             differentialFlameGraphFiles.append(diffSVGFile)
 
+    runConcurrently(flameGraphTasks)
+    runConcurrently(diffFlameGraphTasks)
     return flameGraphPctFilePair, differentialFlameGraphFiles
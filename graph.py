@@ -8,6 +8,9 @@
 #limitations under the License.
 
 import logging
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+from sys import intern
 
 logging.basicConfig(format='%(asctime)s %(levelname)-8s %(message)s',
                     level=logging.INFO,
@@ -103,6 +106,11 @@ class GraphNode():
     Additionally, it has the start time, duration, and end time (starttime + duration).
     Since, sometimes we edit these time values, we record originalStartTime and originalDuration.
     """
+    # A trace can have tens of thousands of spans; slots avoid a __dict__ per node.
+    __slots__ = ('sid', 'startTime', 'originalStartTime', 'duration',
+                 'originalDuration', 'parentSpanId', 'endTime', 'parent',
+                 'opName', 'pid', 'children', 'callPath', 'canonicalName')
+
     def __init__(self, sid, startTime, duration, parentSpanId, opName,
                  processID):
         self.sid = sid
@@ -115,18 +123,43 @@ class GraphNode():
         self.parent = None
         self.opName = opName
         self.pid = processID
-        self.children = {}
+        self.children = []
+        self.callPath = None  # memoized by Graph.getCallPath
+        self.canonicalName = None  # memoized by Graph.canonicalOpName
 
     def setParent(self, parent):
         self.parent = parent
 
     def addChild(self, child):
-        self.children[child] = True
+        self.children.append(child)
 
     def __repr__(self):
         return f'Node(SpanID={self.sid}, startTime={self.startTime}, duration={self.duration}, parent={self.parent}, opName={self.opName})'
 
 
+class SyncEvents():
+    """
+    SyncEvents counts how many start and end times of a set of sibling GraphNodes fall in a time window.
+    The sorted start and end times are built on the first query, since most parents never need one,
+    after which each query is two binary searches per list instead of a scan over all siblings.
+    """
+    def __init__(self, children):
+        self.children = children
+        self.startTimes = None
+        self.endTimes = None
+
+    def numInWindowInclusive(self, startTime, endTime):
+        if startTime > endTime:
+            return 0
+        if self.startTimes == None:
+            self.startTimes = sorted(c.startTime for c in self.children)
+            self.endTimes = sorted(c.endTime for c in self.children)
+        return (bisect_right(self.startTimes, endTime) -
+                bisect_left(self.startTimes, startTime) +
+                bisect_right(self.endTimes, endTime) -
+                bisect_left(self.endTimes, startTime))
+
+
 class Graph():
     """
     Graph represents a Jaeger trace composed of spans (represented by GraphNodes).
@@ -146,6 +179,8 @@ class Graph():
         self.totalShrink = 0
         self.totalDrop = 0
         self.shrinkCounter = 0
+        self.numNodes = 0  # spans reachable from the root after sanitizing
+        self.depth = 0
         self.testing = {}
         self.exclusiveExampleMap = {}
         self.inclusiveExampleMap = {}
@@ -166,13 +201,13 @@ class Graph():
                 self.rootNode = potentialRoots[0]
         else:  # randomly choose some one node whose service and op names match
             for candidate in potentialRoots:
+                # findARoot only returns a node with the expected service and operation names.
                 someRoot = self.findARoot(candidate)
-                if someRoot == None or self.checkRootAndWarn(
-                        someRoot, filename, rootTrace) == False:
+                if someRoot == None:
                     continue
                 # make someRoot's parent as None
                 someRoot.parent = None
-                someRoot.parentId = None
+                someRoot.parentSpanId = None
                 # set someRoot as the rootNode
                 self.rootNode = someRoot
                 break
@@ -186,33 +221,24 @@ class Graph():
         self.sanitizeOverflowingChildren(self.rootNode)
 
         if debug_on:
-            logging.debug(f"{self.totalShrink} of duation compressed")
-            logging.debug(f"{self.shrinkCounter} spans shrank")
-            logging.debug(f"{self.totalDrop} spans dropped")
-            logging.debug(f"total executionTime {self.rootNode.duration}")
+            logging.debug("%s of duation compressed", self.totalShrink)
+            logging.debug("%s spans shrank", self.shrinkCounter)
+            logging.debug("%s spans dropped", self.totalDrop)
+            logging.debug("total executionTime %s", self.rootNode.duration)
 
     def findARoot(self, node):
         # a DFS for finding the first node that matches the required service and operation name.
-        if self.processName[
-                node.
-                pid] == self.serviceName and node.opName == self.operationName:
-            return node
-        for c in node.children:
-            found = self.findARoot(c)
-            if found != None:
-                return found
+        # Children are pushed in reverse so that they are visited in the same preorder as a recursive DFS.
+        stack = [node]
+        while stack:
+            cur = stack.pop()
+            if self.processName[
+                    cur.
+                    pid] == self.serviceName and cur.opName == self.operationName:
+                return cur
+            stack.extend(reversed(cur.children))
         return None
 
-    def computeGraphStats(self, node):
-        # a DFS
-        descendants = 0
-        depth = 0
-        for c in node.children:
-            moreDescendants, newDepth = self.computeGraphStats(c)
-            descendants = descendants + moreDescendants
-            depth = newDepth if newDepth > depth else depth
-        return descendants + 1, depth + 1
-
     def checkRootAndWarn(self, node, filename, rootTrace):
         if self.processName[
                 node.
@@ -253,55 +279,56 @@ class Graph():
 
         potentialRoots = []
 
-        # pass 1: extract all spans and create one GraphNode for each.
+        # pass 1: extract all spans and create one GraphNode for each,
+        # and record service names and other KV data of the processes alongside.
+        # Names repeat across many spans, so they are interned to share one string each.
         for item in jsonData['data']:
             for span in item[_SPANS]:
                 thisSpan = span[_SPAN_ID]
                 parentSpanId = None
                 # We only care about _CHILD_OF spans reachable from the root.
-                for parent in span[_REFERENCES]:
+                # If there are several, the last one is the parent, so scan from the end and stop at the first match.
+                for parent in reversed(span[_REFERENCES]):
                     if parent[_REF_TYPE] == _CHILD_OF:
                         parentSpanId = parent[_SPAN_ID]
+                        break
 
                 node = GraphNode(
                     thisSpan,
                     span[_START_TIME],
                     span[_DURATION],
                     parentSpanId,  # no parent YET, only spanID is available.
-                    span[_OPERATION_NAME],
-                    span[_PROCESS_ID])
+                    intern(span[_OPERATION_NAME]),
+                    intern(span[_PROCESS_ID]))
 
                 self.nodeHT[thisSpan] = node
 
+            for p, process in item[_PROCESSES].items():
+                self.processName[p] = intern(process['serviceName'])
+                if _TAGS in process:
+                    for dictionary in process[_TAGS]:
+                        if dictionary['key'] == _HOSTNAME:
+                            self.hostMap[p] = dictionary['value']
+
         # pass 2: add parent-child relations to GraphNodes.
-        for spanId in self.nodeHT:
-            me = self.nodeHT[spanId]
+        for me in self.nodeHT.values():
             parentId = me.parentSpanId
             if parentId == None:
                 potentialRoots.append(me)
                 continue
-            if parentId not in self.nodeHT:
+            parent = self.nodeHT.get(parentId)
+            if parent == None:
                 debug_on and logging.debug(
-                    f"Span {spanId}'s parent {parentId} not present in nodeHT: file = {self.filename}"
-                )
+                    "Span %s's parent %s not present in nodeHT: file = %s",
+                    me.sid, parentId, self.filename)
                 potentialRoots.append(me)
                 continue
 
-            parent = self.nodeHT[parentId]
             me.setParent(parent)
             parent.addChild(me)
 
-        # pass 3: record service names and other KV data
-        for item in jsonData['data']:
-            for p in item[_PROCESSES]:
-                self.processName[p] = item[_PROCESSES][p]['serviceName']
-                if _TAGS in item[_PROCESSES][p]:
-                    for dictionary in item[_PROCESSES][p][_TAGS]:
-                        if dictionary['key'] == _HOSTNAME:
-                            self.hostMap[p] = dictionary['value']
-
         # for testing only, we keep the expected results in _TESTING section of JSON.
-        # pass 4 : record test results
+        # pass 3 : record test results
         if _TESTING in jsonData and len(jsonData[_TESTING]) > 0:
             results = {}
             for k, v in jsonData[_TESTING][0].items():
@@ -310,132 +337,156 @@ class Graph():
 
         return potentialRoots
 
-    def sanitizeOverflowingChildren(self, curNode):
+    def sanitizeOverflowingChildren(self, rootNode):
         # if a child overflows or underflows its parent, it will be truncated/deleted to match/adhere to parent timeline.
-        parentStart = curNode.startTime
-        parentEnd = curNode.endTime
-
-        removeList = []
-        for c in curNode.children:
-            childStart = c.startTime
-            childEnd = c.endTime
-            debug_on and logging.debug(
-                f"working on parent {curNode}, child {c}")
-            debug_on and logging.debug(
-                f"parent start {parentStart}, parent end {parentEnd}")
-            debug_on and logging.debug(
-                f"child start {childStart}, child end {childEnd}")
-            if childStart >= parentStart and childEnd <= parentEnd:
-                # case 1: everything looks good
-                # |----parent----|
-                #   |----child--|
-                debug_on and logging.debug(f"Case 1")
-                # continue recursion
-                self.sanitizeOverflowingChildren(c)
-            elif childStart < parentStart and childEnd <= parentEnd and childEnd > parentStart:
-                # case 2: child start before parent, truncate is needed
-                #      |----parent----|
-                #   |----child--|
-                debug_on and logging.debug(f"Case 2")
-                shrunk = (parentStart - childStart)
-                self.totalShrink += shrunk
-                self.shrinkCounter += 1
-                c.startTime = parentStart
-                c.duration -= shrunk
-                debug_on and self.dumpShrinkStats(curNode, c, shrunk)
-                # continue recursion
-                self.sanitizeOverflowingChildren(c)
-            elif childStart >= parentStart and childEnd > parentEnd and childStart < parentEnd:
-                # case 3: child end after parent, truncate is needed
-                #      |----parent----|
-                #              |----child--|
-                debug_on and logging.debug(f"Case 3")
-                shrunk = (childEnd - parentEnd)
-                self.totalShrink += shrunk
-                self.shrinkCounter += 1
-                c.duration -= shrunk
-                c.endTime -= shrunk
-                debug_on and self.dumpShrinkStats(curNode, c, shrunk)
-                # continue recursion
-                self.sanitizeOverflowingChildren(c)
-            else:
+        # The tree is walked with an explicit stack so that deep traces do not hit Python's recursion limit.
+        # The same walk counts the surviving nodes and the depth of the tree.
+        totalShrink = 0
+        shrinkCounter = 0
+        numNodes = 0
+        maxDepth = 0
+        stack = [(rootNode, 1)]
+        while stack:
+            curNode, depth = stack.pop()
+            numNodes += 1
+            maxDepth = depth if depth > maxDepth else maxDepth
+            parentStart = curNode.startTime
+            parentEnd = curNode.endTime
+
+            removeList = []
+            for c in curNode.children:
+                childStart = c.startTime
+                childEnd = c.endTime
+                debug_on and logging.debug(
+                    "working on parent %s, child %s\n"
+                    "parent start %s, parent end %s\n"
+                    "child start %s, child end %s", curNode, c, parentStart,
+                    parentEnd, childStart, childEnd)
+                # Branch on the child's start first so that the common case 1 costs two compares;
+                # cases 1-3 continue with the next child, anything else falls through to case 4.
+                if childStart >= parentStart:
+                    if childEnd <= parentEnd:
+                        # case 1: everything looks good
+                        # |----parent----|
+                        #   |----child--|
+                        debug_on and logging.debug("Case 1")
+                        # continue with the child
+                        stack.append((c, depth + 1))
+                        continue
+                    if childStart < parentEnd:
+                        # case 3: child end after parent, truncate is needed
+                        #      |----parent----|
+                        #              |----child--|
+                        debug_on and logging.debug("Case 3")
+                        shrunk = (childEnd - parentEnd)
+                        totalShrink += shrunk
+                        shrinkCounter += 1
+                        c.duration -= shrunk
+                        c.endTime -= shrunk
+                        debug_on and self.dumpShrinkStats(curNode, c, shrunk)
+                        # continue with the child
+                        stack.append((c, depth + 1))
+                        continue
+                elif childEnd <= parentEnd and childEnd > parentStart:
+                    # case 2: child start before parent, truncate is needed
+                    #      |----parent----|
+                    #   |----child--|
+                    debug_on and logging.debug("Case 2")
+                    shrunk = (parentStart - childStart)
+                    totalShrink += shrunk
+                    shrinkCounter += 1
+                    c.startTime = parentStart
+                    c.duration -= shrunk
+                    debug_on and self.dumpShrinkStats(curNode, c, shrunk)
+                    # continue with the child
+                    stack.append((c, depth + 1))
+                    continue
                 # case 4: child outside of parent rantge =>  drop the child span
                 #      |----parent----|
                 #                        |----child--|
                 # or
                 #                      |----parent----|
                 #       |----child--|
-                debug_on and logging.debug(f"Case 4")
+                debug_on and logging.debug("Case 4")
                 debug_on and self.dumpDeletionStats(curNode, c, c.duration)
                 removeList.append(c)
-                # no recursion; all descendants will become unreachable from the root.
-
-        # now delete the list of items marked for deletion.
-        for r in removeList:
-            r.parent = None
-            del curNode.children[r]
+                # not pushed; all descendants will become unreachable from the root.
+
+            # now delete the list of items marked for deletion.
+            if removeList:
+                for r in removeList:
+                    r.parent = None
+                removeSet = set(removeList)
+                curNode.children = [
+                    c for c in curNode.children if c not in removeSet
+                ]
+
+        self.totalShrink += totalShrink
+        self.shrinkCounter += shrinkCounter
+        self.numNodes = numNodes
+        self.depth = maxDepth
 
     def dumpShrinkStats(self, curNode, child, shrunk):
         logging.debug(
-            f" shrunk node {curNode} duration {curNode.duration} by {shrunk}: child {child} => {shrunk / curNode.duration * 100}  reduction"
-        )
+            " shrunk node %s duration %s by %s: child %s => %s  reduction",
+            curNode, curNode.duration, shrunk, child,
+            shrunk / curNode.duration * 100)
 
     def dumpDeletionStats(self, curNode, child, shrunk):
         if curNode.duration > 0:
             logging.debug(
-                f" delete: parent node {curNode} duration {curNode.duration} with child {child} of {shrunk} => {shrunk / curNode.duration * 100}  reduction"
-            )
-
-    def computeCriticalPath(self, curNode):
-        # Recursively find the critical path for curNode.
-        debug_on and logging.debug(
-            f"Working on CP parent {curNode} {self.canonicalOpName(curNode)}")
-
-        # step 0. curNode is obviously on the critical path.
-        criticalPath = [curNode]
-
-        if len(curNode.children) == 0:
-            debug_on and logging.debug(f"{curNode} has no children")
-            return criticalPath
-
-        # step 1. reverse sort all children of curNode by their end time.
-        sortedChildren = sorted(curNode.children,
-                                key=lambda x: x.endTime)[::-1]
-
-        # step 2. begin by the child who finishes last
-        lrc = sortedChildren[0]
-        criticalPath.extend(self.computeCriticalPath(lrc))
-        lastStartTime = lrc.startTime
-
-        for cn in sortedChildren[
-                1:]:  # first one (actually the last one) is already added
-            # step 3. get the child who finished just before the start of lrc's start
-            if self.happensBefore(curNode, sortedChildren, cn, lrc):
-                debug_on and logging.debug(
-                    f"Adding child {cn} {self.canonicalOpName(cn)} to CP")
-                # # step 4. recur on cn, which is on the critical path.
-                criticalPath.extend(self.computeCriticalPath(cn))
-                lrc = cn
-                lastStartTime = min(lastStartTime, cn.startTime)
-            else:
-                debug_on and logging.debug(
-                    f"NOT adding child {cn} {self.canonicalOpName(cn)} to CP")
+                " delete: parent node %s duration %s with child %s of %s => %s  reduction",
+                curNode, curNode.duration, child, shrunk,
+                shrunk / curNode.duration * 100)
+
+    def computeCriticalPath(self, rootNode):
+        # Find the critical path for rootNode.
+        # Each node's children are swept once, from the one that finishes last backwards,
+        # and the nodes are returned in the same depth-first order as the recursive formulation:
+        # a node followed by the critical paths of its critical children, latest child first.
+        criticalPath = []
+        stack = [rootNode]
+        while stack:
+            curNode = stack.pop()
+            debug_on and logging.debug("Working on CP parent %s %s", curNode,
+                                       self.canonicalOpName(curNode))
+
+            # step 0. curNode is obviously on the critical path.
+            criticalPath.append(curNode)
+
+            if len(curNode.children) == 0:
+                debug_on and logging.debug("%s has no children", curNode)
+                continue
 
-            debug_on and logging.debug(f"lastStartTime = {lastStartTime}")
+            # step 1. reverse sort all children of curNode by their end time.
+            # Children that end at the same time stay in reverse insertion order.
+            sortedChildren = sorted(reversed(curNode.children),
+                                    key=attrgetter('endTime'),
+                                    reverse=True)
+
+            # step 2. begin by the child who finishes last
+            lrc = sortedChildren[0]
+            criticalChildren = [lrc]
+            syncEvents = SyncEvents(sortedChildren)
+
+            for cn in sortedChildren[
+                    1:]:  # first one (actually the last one) is already added
+                # step 3. get the child who finished just before the start of lrc's start
+                if self.happensBefore(curNode, syncEvents, cn, lrc):
+                    debug_on and logging.debug("Adding child %s %s to CP", cn,
+                                               self.canonicalOpName(cn))
+                    # step 4. cn is on the critical path; its start is the new boundary.
+                    criticalChildren.append(cn)
+                    lrc = cn
+                else:
+                    debug_on and logging.debug("NOT adding child %s %s to CP",
+                                               cn, self.canonicalOpName(cn))
+
+            # step 5. visit the critical children next, the one that finishes last first.
+            stack.extend(reversed(criticalChildren))
         return criticalPath
 
-    def numSyncEventsInWindowInclusive(self, children, startTime, endTime):
-        numEvents = 0
-
-        for c in children:
-            if c.startTime >= startTime and c.startTime <= endTime:
-                numEvents = numEvents + 1
-            if c.endTime >= startTime and c.endTime <= endTime:
-                numEvents = numEvents + 1
-        return numEvents
-
-    def happensBefore(self, parent, reverseSortedChildren, childBefore,
-                      childLater):
+    def happensBefore(self, parent, syncEvents, childBefore, childLater):
         # happensBefore returns true if the end of childBefore happens before the start of childLater.
         # however, there is some heuristic to accomodate clock skew.
 
@@ -457,11 +508,10 @@ class Graph():
                     (childBefore.endTime - childLater.startTime) /
                     parent.duration < _OVERLAP_ALLOWANCE_FRACTION):
             # Now check that there is no other overlapping child in this region
-            nEvt = self.numSyncEventsInWindowInclusive(reverseSortedChildren,
-                                                       childLater.startTime,
-                                                       childBefore.endTime)
-            debug_on and logging.debug(
-                f"nEvt for {self.canonicalOpName(childBefore)} = {nEvt}")
+            nEvt = syncEvents.numInWindowInclusive(childLater.startTime,
+                                                   childBefore.endTime)
+            debug_on and logging.debug("nEvt for %s = %s",
+                                       self.canonicalOpName(childBefore), nEvt)
             if nEvt == 2:  # there can two and only 2 events in this window
                 return True
         return False
@@ -472,17 +522,32 @@ class Graph():
 
     def canonicalOpName(self, node):
         # return the canonical name of the span in "[serviceName] operationName" fashion
-        return '[' + self.processName[node.pid] + '] ' + node.opName
+        # The name is built on first use, so spans that are never reported need no process entry.
+        if node.canonicalName == None:
+            node.canonicalName = intern('[' + self.processName[node.pid] +
+                                        '] ' + node.opName)
+        return node.canonicalName
 
     def getCallPath(self, graphNode):
         # getCallPath obtains the stringified form of how the rootnode reaches graphNode
         # the operation names are joined with "->".
-        # TODO: this can be optimized via memoization.
-        str = self.canonicalOpName(graphNode)
-        while graphNode.parent != None:
-            str = self.canonicalOpName(graphNode.parent) + "->" + str
-            graphNode = graphNode.parent
-        return str
+        # The call path is memoized on each node, so a path is built by extending its parent's.
+        if graphNode.callPath != None:
+            return graphNode.callPath
+        # collect graphNode and its ancestors whose call path is not known yet.
+        pending = []
+        node = graphNode
+        while node != None and node.callPath == None:
+            pending.append(node)
+            node = node.parent
+        prefix = None if node == None else node.callPath
+        for n in reversed(pending):
+            if prefix == None:
+                n.callPath = self.canonicalOpName(n)
+            else:
+                n.callPath = prefix + "->" + self.canonicalOpName(n)
+            prefix = n.callPath
+        return graphNode.callPath
 
     def getMetrics(self, criticalPath):
         # Compute inclusive and exclustive metrics.
@@ -496,10 +561,14 @@ class Graph():
         exclusiveExampleMap = {}
         inclusiveExampleMap = {}
         callChain = {}
+        # bind the per-node helpers once; they are called several times for every node.
+        canonicalOpName = self.canonicalOpName
+        getCallPath = self.getCallPath
+        rootNode = self.rootNode
         for n in reversed(criticalPath):
-            sid = n.sid
-            op = self.canonicalOpName(n)
-            opCallapth = self.getCallPath(n)
+            duration = n.duration
+            op = canonicalOpName(n)
+            opCallapth = getCallPath(n)
 
             # record in the set of callChains reaching this operation.
             if op not in self.callChain:
@@ -507,54 +576,44 @@ class Graph():
             callChain[op].append(opCallapth)
 
             # flat profile
-            accumulateInDict(opTimeExclusive, op, n.duration)
-            accumulateInDict(opTimeInclusive, op, n.duration)
+            opTimeExclusive[op] = opTimeExclusive.get(op, 0) + duration
+            opTimeInclusive[op] = opTimeInclusive.get(op, 0) + duration
 
             # callpath profile
-            accumulateInDict(callpathTimeExlusive, opCallapth, n.duration)
-            accumulateInDict(callpathTimeInclusive, opCallapth, n.duration)
-
-            # maintain the worst case example
-            maxExample(exclusiveExampleMap, opCallapth, n.sid, n.duration)
-            maxExample(inclusiveExampleMap, opCallapth, n.sid, n.duration)
+            callpathTimeExlusive[opCallapth] = callpathTimeExlusive.get(
+                opCallapth, 0) + duration
+            callpathTimeInclusive[opCallapth] = callpathTimeInclusive.get(
+                opCallapth, 0) + duration
+
+            # maintain the worst case example; the first one seen wins ties.
+            example = exclusiveExampleMap.get(opCallapth)
+            if example == None or duration > example[1]:
+                exclusiveExampleMap[opCallapth] = (n.sid, duration)
+            example = inclusiveExampleMap.get(opCallapth)
+            if example == None or duration > example[1]:
+                inclusiveExampleMap[opCallapth] = (n.sid, duration)
 
             # no parent for root
-            if n == self.rootNode:
+            if n == rootNode:
                 continue
 
             # for exclusive metrics, subtract the child's duration from its parent.
             # if the parent is visited after the child(ren) we will have an existing -ve value to which a positive value will be added above.
-            parentName = self.canonicalOpName(n.parent)
+            parent = n.parent
+            parentName = canonicalOpName(parent)
             # -ve duration is added or inserted
-            accumulateInDict(opTimeExclusive, parentName, -n.duration)
-            parentCC = self.getCallPath(n.parent)
+            opTimeExclusive[parentName] = opTimeExclusive.get(parentName,
+                                                              0) - duration
+            # getCallPath(n) above already memoized the parent's call path.
+            parentCC = getCallPath(parent)
             # -ve duration is added or inserted
-            accumulateInDict(callpathTimeExlusive, parentCC, -n.duration)
+            callpathTimeExlusive[parentCC] = callpathTimeExlusive.get(
+                parentCC, 0) - duration
 
-        descendants, depth = self.computeGraphStats(self.rootNode)
         return Metrics(opTimeExclusive, callpathTimeExlusive,
                        exclusiveExampleMap, opTimeInclusive,
                        callpathTimeInclusive, inclusiveExampleMap, callChain,
-                       self.rootNode.sid, descendants, depth)
-
-
-def accumulateInDict(dictName, key, value):
-    if key in dictName:
-        # add value to existing key in dictName
-        dictName[key] = dictName[key] + value
-    else:
-        # insert new key and value into dictName
-        dictName[key] = value
-
-
-def maxExample(dictName, key, sid, value):
-    if key in dictName:
-        if value > dictName[key][1]:
-            # remember if this is the worst case seen
-            dictName[key] = (sid, value)
-    else:
-        # remember since this is the first case seen
-        dictName[key] = (sid, value)
+                       self.rootNode.sid, self.numNodes, self.depth)
 
 
 class Metrics():
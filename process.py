@@ -9,18 +9,27 @@
 
 import json
 import glob
+import mmap
 import os
-from multiprocessing import Pool, Value
+from multiprocessing import Pool
 from graph import *
 import argparse
 import re
+from collections import defaultdict
+import numpy as np
 import pandas as pd
 import sys
+import warnings
 from datetime import datetime
 import logging
-import subprocess
 import flamegraph
 
+# orjson parses trace files several times faster than the standard json module; use it when available.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 DATE_TIME = datetime.now().strftime("%d_%B_%Y_%H_%M_%S")
 logging.basicConfig(format='%(asctime)s %(levelname)-8s %(message)s',
                     level=logging.INFO,
@@ -193,6 +202,9 @@ htmlPrefixStr = '''
 
 htmlGenerationTime = '''<h1>Critical path generated on %s </h1>''' % DATE_TIME
 
+# Filled in with the percentile and the SVG file name of each flame graph.
+htmlFlameGraphStr = '''<div> <h2>%s flame graph. </h2> <img src=%s></div>'''
+
 htmlSuffixStr = '''
   <script type = "text/javascript">
   /**
@@ -248,23 +260,38 @@ document.querySelectorAll(".table-sortable th").forEach(headerCell => {
 '''
 
 
+def loadJSON(f):
+    # Decode the JSON file f, opened in binary mode.
+    if orjson == None:
+        return json.load(f)
+    # orjson can parse straight from a read-only mapping of the file, which spares a copy of its bytes.
+    try:
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        # empty files and non-regular files such as pipes cannot be mapped.
+        m = None
+    if m == None:
+        return orjson.loads(f.read())
+    with m, memoryview(m) as view:
+        return orjson.loads(view)
+
+
 def process(filename):
     # process one Jaeger JSON trace file
-    with open(os.path.join(filename), 'r') as f:
-        data = json.load(f)
+    with open(os.path.join(filename), 'rb') as f:
+        data = loadJSON(f)
         graph = Graph(data, serviceName, operationName, filename, rootTrace)
         if graph.rootNode == None:
             return Metrics({}, {}, {}, {}, {}, {}, {}, 0, 0, 0)
 
         res = graph.findCriticalPath()
-        debug_on and logging.debug("critical path:" + str(res))
+        debug_on and logging.debug("critical path:%s", res)
 
         metrics = graph.getMetrics(res)
-        debug_on and logging.debug(metrics.opTimeExclusive)
+        debug_on and logging.debug("%s", metrics.opTimeExclusive)
 
-        debug_on and logging.debug(
-            "Test result = " +
-            str(graph.checkResults(metrics.opTimeExclusive)))
+        debug_on and logging.debug("Test result = %s",
+                                   graph.checkResults(metrics.opTimeExclusive))
 
         # artifically introduce the totalTime entry
         metrics.opTimeExclusive['totalTime'] = graph.rootNode.duration
@@ -275,9 +302,11 @@ def process(filename):
 def mapReduce(numWorkers, jaegerTraceFiles):
     # Build graph for each trace file and compute its critical path.
     # Use python multiprocessing to split work on to numWorkers.
+    # Trace sizes vary widely, so hand out one file at a time instead of pre-sliced chunks
+    # to keep a worker stuck on a large trace from holding back the files queued behind it.
     metrics = None
     with Pool(numWorkers) as p:
-        metrics = p.map(process, jaegerTraceFiles)
+        metrics = p.map(process, jaegerTraceFiles, chunksize=1)
     return metrics
 
 
@@ -285,7 +314,7 @@ class SummaryResult:
     """
     SummaryResult holds the following measurements as dictionaries
     1. opTime: the flat profile with exclusive operation times.
-    2. callpathTime: the call-path profile with callpath times.
+    2. callpathTime: the call-path profile with callpath times summed across traces.
     3. exampleMap: per callpath worst case example.
     """
 
@@ -295,30 +324,18 @@ class SummaryResult:
         self.exampleMap = exampleMap
 
 
-def getTraceIdFromFilePath(traceFile):
-    # A trace file path will look like /foo/bar/73212187.json
-    # We need to return 73212187
-    return traceFile.split('/')[-1].split('.')[0]
-
-
 def mergeCallChains(callMap, totalCallMap):
     # Collect all call chains per opName
-    for opName in callMap:
-        if opName not in totalCallMap:
-            totalCallMap[opName] = set()
-        for name in callMap[opName]:
-            totalCallMap[opName].add(name)
+    for opName, names in callMap.items():
+        totalCallMap[opName].update(names)
 
 
 def mergeCallpathTime(callMap, callPathMap, totalBreakdownTime):
-    # Collect all call paths and thier corresponding time
+    # Collect all call paths and sum up thier corresponding time
     for opName, paths in callMap.items():
-        if opName not in totalBreakdownTime:
-            totalBreakdownTime[opName] = {}
+        breakdownTime = totalBreakdownTime[opName]
         for p in paths:
-            if p not in totalBreakdownTime[opName]:
-                totalBreakdownTime[opName][p] = []
-            totalBreakdownTime[opName][p].append(callPathMap[p])
+            breakdownTime[p] += callPathMap[p]
 
 
 def mergeExampleID(traceID, localExampleMap, exampleMap):
@@ -332,41 +349,39 @@ def mergeExampleID(traceID, localExampleMap, exampleMap):
                                   localExampleMap[opName][1])
 
 
-def aggregateMetrics(metrics, jaegerTraceFiles):
+def aggregateMetrics(metrics, traceIDs):
     # Compute aggregate metrics from individual metrics.
     exclusive, inclusive = SummaryResult({}, {}, {}), SummaryResult({}, {}, {})
     exclusive.opTime = {}
     inclusive.opTime = {}
-    aggregateCallMap = {}
-    exclusive.callpathTime = {}
-    inclusive.callpathTime = {}
+    aggregateCallMap = defaultdict(set)
+    exclusive.callpathTime = defaultdict(lambda: defaultdict(int))
+    inclusive.callpathTime = defaultdict(lambda: defaultdict(int))
     exclusive.exampleMap = {
     }  # stores the most time consuming traceID and spanID for each [serviceName] opName pair: (traceID, spanID, time)
     inclusive.exampleMap = {}
 
-    for i in range(len(jaegerTraceFiles)):
-        traceID = getTraceIdFromFilePath(jaegerTraceFiles[i])
-
+    for traceID, metric in zip(traceIDs, metrics):
         # remember per-trace info
-        exclusive.opTime[traceID] = metrics[i].opTimeExclusive
-        inclusive.opTime[traceID] = metrics[i].opTimeInclusive
-        mergeCallChains(callMap=metrics[i].callChain,
+        exclusive.opTime[traceID] = metric.opTimeExclusive
+        inclusive.opTime[traceID] = metric.opTimeInclusive
+        mergeCallChains(callMap=metric.callChain,
                         totalCallMap=aggregateCallMap)
 
-        mergeCallpathTime(callMap=metrics[i].callChain,
-                          callPathMap=metrics[i].callpathTimeExlusive,
+        mergeCallpathTime(callMap=metric.callChain,
+                          callPathMap=metric.callpathTimeExlusive,
                           totalBreakdownTime=exclusive.callpathTime)
 
-        mergeCallpathTime(callMap=metrics[i].callChain,
-                          callPathMap=metrics[i].callpathTimeInclusive,
+        mergeCallpathTime(callMap=metric.callChain,
+                          callPathMap=metric.callpathTimeInclusive,
                           totalBreakdownTime=inclusive.callpathTime)
 
         mergeExampleID(traceID=traceID,
-                       localExampleMap=metrics[i].exclusiveExampleMap,
+                       localExampleMap=metric.exclusiveExampleMap,
                        exampleMap=exclusive.exampleMap)
 
         mergeExampleID(traceID=traceID,
-                       localExampleMap=metrics[i].inclusiveExampleMap,
+                       localExampleMap=metric.inclusiveExampleMap,
                        exampleMap=inclusive.exampleMap)
 
     return exclusive, inclusive, aggregateCallMap
@@ -391,54 +406,50 @@ class PVal:
 
 
 def insertInDF(metric, opsStableOrder, traceIDsStableOrder):
-    df = pd.DataFrame(index=traceIDsStableOrder)
-    # updates df by inserting the operation times for each operation
-    for op in opsStableOrder:
-        opColumn = []
-        for trace in traceIDsStableOrder:
-            if op in metric.opTime[trace]:
-                opColumn.append(metric.opTime[trace][op])
-            else:
-                opColumn.append(0)
-        # insert the column
-        df.insert(len(df.columns), op, opColumn)
-    return df
+    # Build the df in one go from the operation times of each operation (0 when absent),
+    # with one row per operation and one column per trace.
+    opTimes = [metric.opTime[trace] for trace in traceIDsStableOrder]
+    return pd.DataFrame(np.array([[opTime.get(op, 0) for opTime in opTimes]
+                                  for op in opsStableOrder]),
+                        index=opsStableOrder,
+                        columns=traceIDsStableOrder)
 
 
 def addPercentileColumns(df, percentiles):
     # Here a data frame looks like this:
-    # traceId       Op1     Op2     Op3 totalTime
-    #   687216      99      1       30    130
-    #   287382      89      2       20    111
-    #   79827       90      3       40    133
+    #            687216 287382 79827
+    # op1         99     89      90
+    # op2         1      2       3
+    # op3         30     20      40
+    # totalTime   130    111     133
+
+    # Compute the quantiles of the non-zero values of all operations at once, by
+    # masking the zeros as NaN. Operations that are never seen come out as NaN.
+    qs = [p.percentile * 100 for p in percentiles]
+    values = df.to_numpy(dtype=np.float64, copy=True)
+    totalTimes = df.loc['totalTime'].to_numpy(dtype=np.float64)
+    values[values == 0] = np.nan
+    if values.shape[1] == 0:
+        # np.nanpercentile collapses the rows of an empty array.
+        pVals = np.full((len(qs), len(values)), np.nan)
+        denominators = [np.nan] * len(qs)
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN rows
+            pVals = np.nanpercentile(values, qs, axis=1)
+        denominators = np.percentile(totalTimes, qs)
 
     columnsToAdd = {}
-    for p in percentiles:
-        columnsToAdd[p.percentileStr] = []
-        columnsToAdd[p.percentileWithPercentSign()] = []
-
-    for p in percentiles:
-        denominator = df['totalTime'].quantile(p.percentile)
-        for i in df:
-            # Compute the quantile of non-zero values of operations
-            nonZeros = df[i].loc[df[i] != 0]
-            if len(nonZeros) == 0:
+    for p, pValRow, denominator in zip(percentiles, pVals, denominators):
+        for i, pVal in zip(df.index, pValRow):
+            if np.isnan(pVal):
                 p.pVal[i] = 0
                 p.pPct[i] = 0
             else:
-                p.pVal[i] = nonZeros.quantile(p.percentile)
-                p.pPct[i] = (p.pVal[i] /
-                             denominator) if denominator != 0 else 0
-            columnsToAdd[p.percentileStr].append(p.pVal[i])
-            columnsToAdd[p.percentileWithPercentSign()].append(p.pPct[i])
-
-    df = df.transpose()
-
-    # Here a data frame looks like this:
-    #      687216 287382 79827
-    # op1   ?      ?       ?
-    # op2   ?      ?       ?
-    # op3   ?      ?       ?
+                p.pVal[i] = pVal
+                p.pPct[i] = (pVal / denominator) if denominator != 0 else 0
+        columnsToAdd[p.percentileStr] = list(p.pVal.values())
+        columnsToAdd[p.percentileWithPercentSign()] = list(p.pPct.values())
 
     for i, p in enumerate(percentiles):
         df.insert(i, p.percentileStr, columnsToAdd[p.percentileStr])
@@ -485,9 +496,12 @@ def reindexDescending(df, exclusive, prefixColumns, traceIDIndex):
     df = df.reindex(opSums.index.tolist())
 
     # traceIds orders by total execution time.
+    totalTimes = {
+        x: exclusive.opTime[x].get('totalTime', 0)
+        for x in traceIDIndex
+    }
     traceIDSorted = sorted(traceIDIndex,
-                           key=lambda x: exclusive.opTime[x]['totalTime']
-                           if 'totalTime' in exclusive.opTime[x] else 0,
+                           key=totalTimes.__getitem__,
                            reverse=True)
     # Sort the columns descending total time per trace.
     return df.reindex(columns=prefixColumns + traceIDSorted)
@@ -532,64 +546,53 @@ def setCellFormating(df, percentiles, occurenceColHeader):
 
 def cssNameHandle(str):
     # Given the call chain, change it into css format with indentation.
-    lst = str.split('->')
-    res = ""
-    for i in range(len(lst)):
-        for j in range(i):
-            res += ' &emsp; '
-        res += lst[i] + '</br>  '
-    return res
+    return ''.join(' &emsp; ' * i + name + '</br>  '
+                   for i, name in enumerate(str.split('->')))
+
+
+def sortCallpathTimes(cc):
+    # Return the (call path, total time) pairs of cc in descending order of time.
+    return sorted(cc.items(), key=lambda x: x[1], reverse=True)
 
 
 def getSummaryText(pval, pctMap, valMap, totalBreakdownTime):
-    summary = ''
-    summary += '<h1>Top %d operations contributing to %s of [%s] %s:</h1>' % (
-        topN, pval, serviceName, operationName)
-
-    res = sorted(pctMap.items(), key=lambda x: x[1], reverse=True)
-    for i in res:
-        if i[0] == 'totalTime':
-            res.remove(i)
-            break
+    summary = []
+    summary.append(
+        '<h1>Top %d operations contributing to %s of [%s] %s:</h1>' %
+        (topN, pval, serviceName, operationName))
+
+    res = sorted(((k, v) for k, v in pctMap.items() if k != 'totalTime'),
+                 key=lambda x: x[1],
+                 reverse=True)
     for idx in range(0, min(topN, len(res))):
-        summary += '<h2>%s. %s -> %s Value: %s, %s percentage: %s, call chains are below:</h2>' % (
-            idx + 1, res[idx][0], pval, '{:.2e}'.format(valMap[res[idx][0]]),
-            pval, '{:.2%}'.format(pctMap[res[idx][0]]))
-        cc = totalBreakdownTime[res[idx][0]]
-        sumCC = 0
-        sortedCC = sorted(cc.items(), key=lambda x: sum(x[1]), reverse=True)
-        for i in sortedCC:
-            for j in i[1]:
-                sumCC += j
-        for i in range(len(sortedCC)):
-            summary += cssNameHandle(sortedCC[i][0] + '</br>' +
-                                     'Contributing: {:.2%}'.format(
-                                         sum(sortedCC[i][1]) /
-                                         sumCC if sumCC != 0 else 1.0))
-            summary += '</br>'
-    return summary
+        summary.append(
+            '<h2>%s. %s -> %s Value: %s, %s percentage: %s, call chains are below:</h2>'
+            % (idx + 1, res[idx][0], pval, '{:.2e}'.format(
+                valMap[res[idx][0]]), pval, '{:.2%}'.format(
+                    pctMap[res[idx][0]])))
+        sortedCC = sortCallpathTimes(totalBreakdownTime[res[idx][0]])
+        sumCC = sum(x[1] for x in sortedCC)
+        for path, time in sortedCC:
+            summary.append(
+                cssNameHandle(path + '</br>' + 'Contributing: {:.2%}'.format(
+                    time / sumCC if sumCC != 0 else 1.0)))
+            summary.append('</br>')
+    return ''.join(summary)
 
 
 def getTopNCCTs(sortedContexts, sumTime, n, exampleMap):
-    res = ''
-    for i in range(min(len(sortedContexts), n)):
-        res += cssNameHandle(
-            sortedContexts[i][0] + '</br>' + 'Contributing: {:.2%}'.format(
-                sum(sortedContexts[i][1]) /
-                sumTime if sumTime != 0 else 0)) + makeClickable(
-                    JAEGER_UI_URL + "/%s?uiFind=%s" %
-                    (exampleMap[sortedContexts[i][0]][0],
-                     exampleMap[sortedContexts[i][0]][1]),
-                    "Example") + '</br>' + '</br>'
-    return res
-
-
-def sum2DCCT(cct):
-    total = 0
-    for i in cct:
-        for j in i[1]:
-            total += j
-    return total
+    # sortedContexts holds (call path, total time) pairs in descending order of time.
+    res = []
+    for path, time in sortedContexts[:n]:
+        res.append(
+            cssNameHandle(path + '</br>' + 'Contributing: {:.2%}'.format(
+                time / sumTime if sumTime != 0 else 0)))
+        res.append(
+            makeClickable(
+                JAEGER_UI_URL + "/%s?uiFind=%s" %
+                (exampleMap[path][0], exampleMap[path][1]), "Example"))
+        res.append('</br>' + '</br>')
+    return ''.join(res)
 
 
 def addToolTip(df, exclusive, inclusive, ignoreSet):
@@ -598,21 +601,16 @@ def addToolTip(df, exclusive, inclusive, ignoreSet):
     for i, idx in enumerate(df.index[:]):  # copy
         if idx in ignoreSet:
             continue
-        res = ""
-        cc = exclusive.callpathTime[idx]
-        sortedCC = sorted(cc.items(), key=lambda x: sum(x[1]), reverse=True)
-        ccInc = inclusive.callpathTime[idx]
-        sortedCCInc = sorted(ccInc.items(),
-                             key=lambda x: sum(x[1]),
-                             reverse=True)
-        sumCC = sum2DCCT(sortedCC)
-        sumCCInc = sum2DCCT(sortedCCInc)
-
-        res += "Exclusive:</br>"
-
-        res += getTopNCCTs(sortedCC, sumCC, 5, exclusive.exampleMap)
-        res += "Inclusive:</br>"
-        res += getTopNCCTs(sortedCCInc, sumCCInc, 5, inclusive.exampleMap)
+        sortedCC = sortCallpathTimes(exclusive.callpathTime[idx])
+        sortedCCInc = sortCallpathTimes(inclusive.callpathTime[idx])
+        sumCC = sum(x[1] for x in sortedCC)
+        sumCCInc = sum(x[1] for x in sortedCCInc)
+
+        res = ''.join(
+            ("Exclusive:</br>",
+             getTopNCCTs(sortedCC, sumCC, 5, exclusive.exampleMap),
+             "Inclusive:</br>",
+             getTopNCCTs(sortedCCInc, sumCCInc, 5, inclusive.exampleMap)))
         renameRowHT[df.index[
             i]] = '<div class="tooltip">%s <span class="tooltiptext">%s</span> </div>' % (
                 df.index[i], res)
@@ -630,7 +628,7 @@ def getGradientFormatFromDataframe(df, precisionHT, firstSorableCoulmn,
                     'class="table-sortable"').set_properties(
                         **{
                             'text-align': 'right'
-                        }).format(precisionHT).render())
+                        }).format(precisionHT).to_html())
 
 
 def heatmapAndSummary(exclusive, inclusive, aggregateCallMap, traceIDIndex,
@@ -649,13 +647,13 @@ def heatmapAndSummary(exclusive, inclusive, aggregateCallMap, traceIDIndex,
     inclusiveDF = insertInDF(inclusive, opsStableOrder, traceIDsStableOrder)
 
     # Here a data frame looks like this:
-    # traceId       Op1     Op2     Op3
-    #   687216      ?      ?       ?
-    #   287382      ?      ?       ?
-    #   79827       ?      ?       ?
+    #      687216 287382 79827
+    # op1   ?      ?       ?
+    # op2   ?      ?       ?
+    # op3   ?      ?       ?
 
-    # Count the non-zeros in each column. These are the number of times an operation appears on the critical path.
-    nonZeroOpCounts = exclusiveDF.astype(bool).sum(axis=0)
+    # Count the non-zeros in each row. These are the number of times an operation appears on the critical path.
+    nonZeroOpCounts = np.count_nonzero(exclusiveDF.to_numpy(), axis=1)
     # Now inject the percentile columns.
     percentilesExclusive = (PVal(.5, 'P50(E)'), PVal(.95, 'P95(E)'),
                             PVal(.99, 'P99(E)'))
@@ -708,10 +706,9 @@ def heatmapAndSummary(exclusive, inclusive, aggregateCallMap, traceIDIndex,
                                                     len(percentilesInclusive))
 
     # Obtain the textual summary.
-    summary = ''
-    for p in percentilesExclusive:
-        summary += getSummaryText(p.percentileStr, p.pPct, p.pVal,
-                                  exclusive.callpathTime)
+    summary = ''.join(
+        getSummaryText(p.percentileStr, p.pPct, p.pVal, exclusive.callpathTime)
+        for p in percentilesExclusive)
 
     # Color the heapmap with the gradient.
     heatmap = getGradientFormatFromDataframe(df, precisionHT,
@@ -721,47 +718,67 @@ def heatmapAndSummary(exclusive, inclusive, aggregateCallMap, traceIDIndex,
     return heatmap, summary, criticalPathJSONStr
 
 
-def replaceNonAlphaNumericWithUnderscore(str):
-    return re.sub('[^a-zA-Z0-9_]+', '_', str)
+NON_ALPHA_NUMERIC_RE = re.compile('[^a-zA-Z0-9_]+')
+
+
+def replaceNonAlphaNumericWithUnderscore(s):
+    return NON_ALPHA_NUMERIC_RE.sub('_', s)
 
 
 saniMap = {'totalTime': 'totalTime'}
 saniCtr = 0
+# The same operations and call paths recur in every trace, so memoize whole names too.
+saniNameMap = {}
 
 
 def sanitized(op):
     global saniCtr
     global saniMap
-    ret = ''
-    pieces = op.split('->')
-    for piece in pieces:
-        if ret != '':
-            ret += '->'
-        if piece in saniMap:
-            ret += saniMap[piece]
-        else:
+    ret = saniNameMap.get(op)
+    if ret != None:
+        return ret
+    pieces = []
+    for piece in op.split('->'):
+        if piece not in saniMap:
             saniCtr += 1
-            ret += 'Service::Operation' + str(saniCtr)
             saniMap[piece] = 'Service::Operation' + str(saniCtr)
+        pieces.append(saniMap[piece])
+    ret = '->'.join(pieces)
+    saniNameMap[op] = ret
     return ret
 
 
 def sanitizeNames(metric):
     for r in metric:
-        for field in [
-                r.opTimeExclusive, r.callpathTimeExlusive,
-                r.exclusiveExampleMap, r.opTimeInclusive,
-                r.callpathTimeInclusive, r.inclusiveExampleMap
-        ]:
-            for k, v in field.copy().items():
-                del field[k]
-                field[sanitized(k)] = v
-        for k, vals in r.callChain.copy().items():
-            del r.callChain[k]
-            sk = sanitized(k)
-            r.callChain[sk] = set()
-            for v in vals:
-                r.callChain[sk].add(sanitized(v))
+        r.opTimeExclusive = {
+            sanitized(k): v
+            for k, v in r.opTimeExclusive.items()
+        }
+        r.callpathTimeExlusive = {
+            sanitized(k): v
+            for k, v in r.callpathTimeExlusive.items()
+        }
+        r.exclusiveExampleMap = {
+            sanitized(k): v
+            for k, v in r.exclusiveExampleMap.items()
+        }
+        r.opTimeInclusive = {
+            sanitized(k): v
+            for k, v in r.opTimeInclusive.items()
+        }
+        r.callpathTimeInclusive = {
+            sanitized(k): v
+            for k, v in r.callpathTimeInclusive.items()
+        }
+        r.inclusiveExampleMap = {
+            sanitized(k): v
+            for k, v in r.inclusiveExampleMap.items()
+        }
+        r.callChain = {
+            sanitized(k): {sanitized(v)
+                           for v in vals}
+            for k, vals in r.callChain.items()
+        }
 
 
 if __name__ == '__main__':
@@ -779,12 +796,13 @@ if __name__ == '__main__':
 
     if anonymize:
         sanitizeNames(metrics)
-    logging.info("Starting aggregateMetrics")
-    exclusive, inclusive, aggregateCallMap = aggregateMetrics(
-        metrics, jaegerTraceFiles)
+    # A trace file path will look like /foo/bar/73212187.json, whose traceID is 73212187.
     traceIDIndex = [
         os.path.splitext(os.path.basename(i))[0] for i in jaegerTraceFiles
     ]
+    logging.info("Starting aggregateMetrics")
+    exclusive, inclusive, aggregateCallMap = aggregateMetrics(
+        metrics, traceIDIndex)
     # create a map of from traceID to the corresponding spanID.
     traceToRootspanMap = {}
     for i in range(len(traceIDIndex)):
@@ -806,12 +824,11 @@ if __name__ == '__main__':
     logging.info("[%s]%s critical path file %s", args.serviceName,
                  args.operationName, criticalPathHTMLFile)
 
+    # Assemble the whole page in memory and write it out at once.
+    html = [htmlPrefixStr, heatMap, htmlGenerationTime]
+    html.extend(htmlFlameGraphStr % (pval, os.path.basename(file))
+                for pval, file in flameGraphPctFilePair)
+    html.append(summary)
+    html.append(htmlSuffixStr)
     with open(criticalPathHTMLFile, 'w') as f:
-        f.write(htmlPrefixStr + heatMap)
-        f.write(htmlGenerationTime)
-        for pval, file in flameGraphPctFilePair:
-            src = os.path.basename(file)
-            f.write('<div> <h2>%s flame graph. </h2> <img src=%s></div>' %
-                    (pval, src))
-        f.write(summary)
-        f.write(htmlSuffixStr)
+        f.write(''.join(html))
@@ -0,0 +1,69 @@
+import glob
+import json
+import os
+
+from graph import Graph, GraphNode, SyncEvents
+
+TEST_CASES_DIR = os.path.join(os.path.dirname(__file__), '..', 'test_cases')
+
+
+def makeSpan(spanID, startTime, duration, processID, parentSpanID=None):
+    references = []
+    if parentSpanID != None:
+        references.append({'refType': 'CHILD_OF', 'spanID': parentSpanID})
+    return {
+        'spanID': spanID,
+        'operationName': 'O1',
+        'references': references,
+        'startTime': startTime,
+        'duration': duration,
+        'processID': processID
+    }
+
+
+def test_spanWithUnknownProcess():
+    # The orphan span B runs on process P9, which is not in the processes map.
+    data = {
+        'data': [{
+            'processes': {
+                'S': {
+                    'serviceName': 'S1'
+                }
+            },
+            'spans': [makeSpan('A', 0, 100, 'S'),
+                      makeSpan('B', 10, 20, 'P9', 'X')]
+        }]
+    }
+    graph = Graph(data, 'S1', 'O1', 'orphan.json', False)
+    metrics = graph.getMetrics(graph.findCriticalPath())
+    assert metrics.opTimeExclusive == {'[S1] O1': 100}
+
+
+def test_criticalPathOfTestCases():
+    # Each test case records its expected exclusive times in the "testing" section.
+    files = sorted(glob.glob(os.path.join(TEST_CASES_DIR, '*.json')))
+    assert len(files) > 0
+    for f in files:
+        with open(f) as fp:
+            graph = Graph(json.load(fp), 'S1', 'O1', f, False)
+        metrics = graph.getMetrics(graph.findCriticalPath())
+        assert graph.checkResults(metrics.opTimeExclusive) == True, f
+
+
+def test_syncEventsInWindowInclusive():
+    children = [
+        GraphNode('A', 0, 10, None, 'O1', 'S'),
+        GraphNode('B', 10, 0, None, 'O1', 'S'),
+        GraphNode('C', 10, 5, None, 'O1', 'S'),
+        GraphNode('D', 20, 5, None, 'O1', 'S')
+    ]
+    syncEvents = SyncEvents(children)
+    # A ends, B starts and ends, and C starts at 10.
+    assert syncEvents.numInWindowInclusive(10, 10) == 4
+    assert syncEvents.numInWindowInclusive(0, 10) == 5
+    # both ends of the window are inclusive.
+    assert syncEvents.numInWindowInclusive(15, 20) == 2
+    assert syncEvents.numInWindowInclusive(16, 19) == 0
+    assert syncEvents.numInWindowInclusive(0, 25) == 8
+    # an empty window has no events.
+    assert syncEvents.numInWindowInclusive(20, 15) == 0